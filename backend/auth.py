@@ -2,21 +2,154 @@ from fastapi import Depends, HTTPException, Header
 from jose import jwt, jwk
 from jose.exceptions import JOSEError
 import httpx
+import asyncio
+import hashlib
+import logging
 import os
+import time
+from collections import OrderedDict
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 ALIEN_SSO_URL = "https://sso.alien-api.com/oauth/jwks"
 AUDIENCE = os.getenv("ALIEN_PROVIDER_ADDRESS")
 ISSUER = "https://sso.alien-api.com"
 DEV_MODE = os.getenv("DEV_MODE", "true").lower() == "true"
 
-async def get_jwks():
-    async with httpx.AsyncClient() as client:
-        response = await client.get(ALIEN_SSO_URL)
-        response.raise_for_status()
-        return response.json()
+JWKS_TTL = 600  # 10 minutes
+JWKS_REFRESH_INTERVAL = JWKS_TTL // 2
+JWKS_MIN_REFETCH_INTERVAL = 60  # floor between kid-miss refetches
+JWKS_RETRY_BACKOFF = 10  # after an attempt (failed or not), wait before fetching again
+VERIFIED_CACHE_SIZE = 10_000
+
+
+# --- JWKS Cache ---
+
+class _JwksCache:
+    keys_by_kid: dict = {}
+    # Compared against time.monotonic(), which may start near 0 on a fresh host
+    fetched_at: float = float("-inf")
+    attempted_at: float = float("-inf")
+    error: Optional[Exception] = None
+    ttl: int = JWKS_TTL
+
+
+_jwks_lock = asyncio.Lock()
+_http_client: Optional[httpx.AsyncClient] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+
+async def _fetch_jwks() -> dict:
+    """Fetch the JWKS document and index its keys by kid."""
+    response = await _http_client.get(ALIEN_SSO_URL)
+    response.raise_for_status()
+    return {key["kid"]: key for key in response.json()["keys"]}
+
+
+def _cached_jwks() -> dict:
+    """Return the cached keys, or raise the last fetch error if there are none."""
+    if not _JwksCache.keys_by_kid and _JwksCache.error is not None:
+        raise _JwksCache.error
+    return _JwksCache.keys_by_kid
+
+
+async def _get_jwks(force: bool = False) -> dict:
+    """Return cached signing keys by kid, refetching when stale or forced.
+    If the fetch fails, the previous keys keep being served."""
+    now = time.monotonic()
+    if not force and now - _JwksCache.fetched_at < _JwksCache.ttl:
+        return _JwksCache.keys_by_kid
+
+    # An attempt just finished — back off rather than hammer the endpoint
+    if not _jwks_lock.locked() and now - _JwksCache.attempted_at < JWKS_RETRY_BACKOFF:
+        return _cached_jwks()
+
+    attempted_at = _JwksCache.attempted_at
+    async with _jwks_lock:
+        # Another coroutine attempted a fetch while we waited; share its result
+        if _JwksCache.attempted_at != attempted_at:
+            return _cached_jwks()
+
+        try:
+            keys = await _fetch_jwks()
+        except Exception as e:
+            logger.warning("JWKS fetch failed: %s", e)
+            _JwksCache.error = e
+            _JwksCache.attempted_at = time.monotonic()
+            return _cached_jwks()
+
+        _JwksCache.keys_by_kid = keys
+        _JwksCache.fetched_at = _JwksCache.attempted_at = time.monotonic()
+        _JwksCache.error = None
+        return keys
+
+
+async def _refresh_jwks_loop():
+    """Keep the JWKS cache warm so requests never wait on a fetch."""
+    while True:
+        try:
+            await _get_jwks(force=True)
+        except Exception:
+            # No keys cached yet; retry next interval
+            logger.exception("JWKS refresh failed")
+        await asyncio.sleep(JWKS_REFRESH_INTERVAL)
+
+
+async def start_auth():
+    """Create the shared keep-alive HTTP client and start the JWKS refresh task."""
+    global _http_client, _refresh_task
+    _http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(2.0),
+        limits=httpx.Limits(max_keepalive_connections=4),
+    )
+    if not DEV_MODE:
+        _refresh_task = asyncio.create_task(_refresh_jwks_loop())
+
+
+async def stop_auth():
+    """Stop the JWKS refresh task and close the shared HTTP client."""
+    global _http_client, _refresh_task
+    if _refresh_task:
+        _refresh_task.cancel()
+        _refresh_task = None
+    if _http_client:
+        await _http_client.aclose()
+        _http_client = None
+
+# --- Verified Token Cache ---
+
+# sha256(token) -> (claims, exp); hits skip signature verification entirely
+_verified: "OrderedDict[bytes, tuple[dict, float]]" = OrderedDict()
+
+
+def _get_verified(digest: bytes) -> Optional[dict]:
+    """Return cached claims for a previously verified, unexpired token."""
+    entry = _verified.get(digest)
+    if entry is None:
+        return None
+    claims, exp = entry
+    if exp <= time.time():
+        del _verified[digest]
+        return None
+    _verified.move_to_end(digest)
+    return claims
+
+
+def _put_verified(digest: bytes, claims: dict):
+    """Remember verified claims until the token's exp, evicting the oldest entry."""
+    exp = claims.get("exp")
+    if not exp:
+        return
+    _verified[digest] = (claims, float(exp))
+    _verified.move_to_end(digest)
+    if len(_verified) > VERIFIED_CACHE_SIZE:
+        _verified.popitem(last=False)
+
 
 async def verify_alien_token(authorization: str = Header(...)):
     if not authorization.startswith("Bearer "):
@@ -28,19 +161,29 @@ async def verify_alien_token(authorization: str = Header(...)):
     if DEV_MODE:
         return token  # Return the token itself as the identity
 
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = _get_verified(digest)
+    if claims is not None:
+        return claims.get("sub")
+
     try:
-        jwks = await get_jwks()
         unverified_header = jwt.get_unverified_header(token)
+        kid = unverified_header["kid"]
+        key = (await _get_jwks()).get(kid)
+        if key is None and time.monotonic() - _JwksCache.fetched_at >= JWKS_MIN_REFETCH_INTERVAL:
+            # Unknown kid — keys may have rotated, refetch once. Rate-limited since
+            # this runs before any signature check and a forged kid costs nothing.
+            key = (await _get_jwks(force=True)).get(kid)
+
         rsa_key = {}
-        for key in jwks["keys"]:
-            if key["kid"] == unverified_header["kid"]:
-                rsa_key = {
-                    "kty": key["kty"],
-                    "kid": key["kid"],
-                    "use": key["use"],
-                    "n": key["n"],
-                    "e": key["e"]
-                }
+        if key:
+            rsa_key = {
+                "kty": key["kty"],
+                "kid": key["kid"],
+                "use": key["use"],
+                "n": key["n"],
+                "e": key["e"]
+            }
         if rsa_key:
             payload = jwt.decode(
                 token,
@@ -49,6 +192,7 @@ async def verify_alien_token(authorization: str = Header(...)):
                 audience=AUDIENCE,
                 issuer=ISSUER
             )
+            _put_verified(digest, payload)
             return payload.get("sub")  # alien_id
 
         raise HTTPException(status_code=401, detail="Unable to find appropriate key")
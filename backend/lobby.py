@@ -1,14 +1,20 @@
 import uuid
-import json
+import orjson
 import asyncio
 import random
-from datetime import datetime, timedelta
+import time
+import logging
+from datetime import datetime, timezone
 from typing import List, Optional
 
-from redis_client import redis
+from redis.exceptions import ResponseError
+
+from redis_client import redis, pubsub_redis
 
 import os
 
+logger = logging.getLogger(__name__)
+
 MAX_PLAYERS = 10
 MIN_PLAYERS = 2
 FORMING_TIMEOUT = 120  # 2 minutes
@@ -16,8 +22,42 @@ NUMBER_CALL_INTERVAL = 3  # 3 seconds
 LOBBY_TTL = 600  # 10 minutes
 MAX_NUMBER = 20
 GLOBAL_LOBBY_KEY = "global_lobby"
+FORMING_DEADLINES_KEY = "forming_deadlines"  # zset: lobby_id scored by deadline
+FORMING_SWEEP_INTERVAL = 5  # seconds
 BUY_IN_AMOUNT = 3500  # Fixed buy-in for single lobby
 
+# The call order decides who wins a paid pot, so draw it from the OS CSPRNG
+_system_random = random.SystemRandom()
+
+
+# --- Timestamps ---
+# Stored in Redis as Unix epoch seconds; converted to ISO only in API responses.
+
+def _now() -> str:
+    return str(int(time.time()))
+
+
+def _to_iso(epoch: Optional[str]) -> str:
+    """Convert a stored epoch timestamp to the naive UTC ISO format clients expect."""
+    if not epoch:
+        return ""
+    return datetime.fromtimestamp(int(epoch), timezone.utc).replace(tzinfo=None).isoformat()
+
+
+# --- Events ---
+
+def events_channel(lobby_id: str) -> str:
+    return f"lobby:{lobby_id}:events"
+
+
+async def publish_event(lobby_id: str, event_type: str, **data):
+    """Record a lobby state change: bump the lobby version (invalidating cached
+    status snapshots) and push the event to WebSocket subscribers."""
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.hincrby(f"lobby:{lobby_id}", "version", 1)
+        pipe.publish(events_channel(lobby_id), orjson.dumps({"type": event_type, **data}))
+        await pipe.execute()
+
 
 # --- Single Global Lobby ---
 
@@ -49,8 +89,8 @@ async def _create_new_global_lobby() -> dict:
         "buy_in_amount": str(BUY_IN_AMOUNT),
         "pot": "0",
         "winner": "",
-        "created_at": datetime.utcnow().isoformat(),
-        "forming_deadline": "",
+        "created_at": _now(),
+        "version": "0",
         "started_at": "",
         "finished_at": "",
     })
@@ -62,9 +102,34 @@ async def _create_new_global_lobby() -> dict:
 
 # --- Player Joining ---
 
+async def _get_player_keys(lobby_id: str) -> List[str]:
+    """Return the player hash keys for a lobby from its player set."""
+    alien_ids = await redis.smembers(f"lobby:{lobby_id}:players")
+    return [f"lobby:{lobby_id}:player:{aid}" for aid in alien_ids]
+
+
+async def _get_players(player_keys: List[str]) -> List[dict]:
+    """Fetch several player hashes in a single round-trip."""
+    async with redis.pipeline(transaction=False) as pipe:
+        for key in player_keys:
+            pipe.hgetall(key)
+        return await pipe.execute()
+
+
 async def add_player_to_lobby(lobby_id: str, alien_id: str) -> dict:
     """Add a player to a lobby. Returns lobby info."""
-    lobby = await redis.hgetall(f"lobby:{lobby_id}")
+    lobby_key = f"lobby:{lobby_id}"
+    player_key = f"lobby:{lobby_id}:player:{alien_id}"
+    players_key = f"lobby:{lobby_id}:players"
+    active_players_key = f"lobby:{lobby_id}:active_players"
+
+    # Read round-trip: lobby, membership and player count
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.hgetall(lobby_key)
+        pipe.exists(player_key)
+        pipe.scard(players_key)
+        lobby, exists, current_count = await pipe.execute()
+
     if not lobby:
         raise ValueError("Lobby not found")
 
@@ -72,49 +137,54 @@ async def add_player_to_lobby(lobby_id: str, alien_id: str) -> dict:
         raise ValueError("Lobby is no longer accepting players")
 
     # Check if player is already in this lobby — return current state
-    exists = await redis.exists(f"lobby:{lobby_id}:player:{alien_id}")
     if exists:
-        player_keys = await redis.keys(f"lobby:{lobby_id}:player:*")
         return {
             "lobby_id": lobby_id,
             "status": lobby["status"],
-            "player_count": len(player_keys),
+            "player_count": current_count,
             "pot": int(lobby["pot"]),
         }
 
     # Check capacity
-    player_keys = await redis.keys(f"lobby:{lobby_id}:player:*")
-    if len(player_keys) >= MAX_PLAYERS:
+    if current_count >= MAX_PLAYERS:
         raise ValueError("Lobby is full")
 
-    # Add player
-    await redis.hset(f"lobby:{lobby_id}:player:{alien_id}", mapping={
-        "alien_id": alien_id,
-        "numbers": "[]",
-        "grid": "[]",
-        "ready": "false",
-        "active": "true",
-        "joined_at": datetime.utcnow().isoformat(),
-    })
-    await redis.expire(f"lobby:{lobby_id}:player:{alien_id}", LOBBY_TTL)
-
-    player_count = len(player_keys) + 1
-    pot = int(lobby["pot"])
-
-    # Auto-credit buy-in
-    await redis.hincrby(f"lobby:{lobby_id}", "pot", BUY_IN_AMOUNT)
-    pot += BUY_IN_AMOUNT
-
-    # Start forming timer on first player join
-    if not lobby.get("forming_deadline"):
-        deadline = (datetime.utcnow() + timedelta(seconds=FORMING_TIMEOUT)).isoformat()
-        await redis.hset(f"lobby:{lobby_id}", "forming_deadline", deadline)
-        asyncio.create_task(forming_timer(lobby_id))
+    # Write round-trip: add player, auto-credit buy-in, and start the forming
+    # deadline if unset (HSETNX, so only the first joiner starts the timer).
+    # MULTI/EXEC so a player is never added without being charged, or vice versa.
+    deadline = str(int(time.time() + FORMING_TIMEOUT))
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(player_key, mapping={
+            "alien_id": alien_id,
+            "numbers": "[]",
+            "grid": "[]",
+            "ready": "0",
+            "active": "1",
+            "joined_at": _now(),
+        })
+        pipe.expire(player_key, LOBBY_TTL)
+        pipe.sadd(players_key, alien_id)
+        pipe.expire(players_key, LOBBY_TTL)
+        pipe.sadd(active_players_key, alien_id)
+        pipe.expire(active_players_key, LOBBY_TTL)
+        pipe.hincrby(lobby_key, "pot", BUY_IN_AMOUNT)
+        pipe.hsetnx(lobby_key, "forming_deadline", deadline)
+        pipe.hincrby(lobby_key, "version", 1)
+        pipe.publish(events_channel(lobby_id), orjson.dumps({"type": "player_joined", "alien_id": alien_id}))
+        *_, pot, deadline_set, _, _ = await pipe.execute()
+
+    if deadline_set:
+        # Any worker's forming listener picks this up when it expires; the
+        # deadline index lets the sweep catch it if the expiry event is missed
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(f"lobby:{lobby_id}:forming_expires", "1", ex=FORMING_TIMEOUT)
+            pipe.zadd(FORMING_DEADLINES_KEY, {lobby_id: int(deadline)})
+            await pipe.execute()
 
     return {
         "lobby_id": lobby_id,
         "status": lobby["status"],
-        "player_count": player_count,
+        "player_count": current_count + 1,
         "pot": pot,
     }
 
@@ -138,23 +208,27 @@ async def submit_grid(lobby_id: str, alien_id: str, grid: List[List[int]]) -> di
     if len(grid) != 3 or any(len(row) != 3 for row in grid):
         raise ValueError("Grid must be 3x3")
 
-    flat = [n for row in grid for n in row]
-    if len(set(flat)) != 9:
-        raise ValueError("Grid must contain 9 unique numbers")
-
-    if not all(1 <= n <= MAX_NUMBER for n in flat):
-        raise ValueError(f"Numbers must be between 1 and {MAX_NUMBER}")
-
-    # Store numbers and grid, mark ready
+    # Single pass: range and duplicate check via a bitmask, no set allocation
+    grid_mask = 0
+    for row in grid:
+        for n in row:
+            if not 1 <= n <= MAX_NUMBER:
+                raise ValueError(f"Numbers must be between 1 and {MAX_NUMBER}")
+            bit = 1 << (n - 1)
+            if grid_mask & bit:
+                raise ValueError("Grid must contain 9 unique numbers")
+            grid_mask |= bit
+
+    # Store numbers, grid and precomputed pattern masks, mark ready
     await redis.hset(f"lobby:{lobby_id}:player:{alien_id}", mapping={
-        "numbers": json.dumps(flat),
-        "grid": json.dumps(grid),
-        "ready": "true",
+        **_grid_fields(grid),
+        "ready": "1",
     })
+    await publish_event(lobby_id, "grid_ready", alien_id=alien_id)
 
     # Check if all players are ready → start game immediately
-    player_keys = await redis.keys(f"lobby:{lobby_id}:player:*")
-    if len(player_keys) >= MIN_PLAYERS:
+    player_count = await redis.scard(f"lobby:{lobby_id}:players")
+    if player_count >= MIN_PLAYERS:
         all_ready = await check_all_players_ready(lobby_id)
         if all_ready:
             await start_game(lobby_id)
@@ -170,23 +244,18 @@ async def submit_grid(lobby_id: str, alien_id: str, grid: List[List[int]]) -> di
 
 async def check_all_players_ready(lobby_id: str) -> bool:
     """Check if all active players have submitted their grid."""
-    player_keys = await redis.keys(f"lobby:{lobby_id}:player:*")
-    for key in player_keys:
-        player = await redis.hgetall(key)
-        if player.get("active") == "true" and player.get("ready") != "true":
+    player_keys = await _get_player_keys(lobby_id)
+    for player in await _get_players(player_keys):
+        if player.get("active") == "1" and player.get("ready") != "1":
             return False
     return True
 
 
 async def _count_ready_players(lobby_id: str) -> int:
     """Count players who have submitted their grid."""
-    player_keys = await redis.keys(f"lobby:{lobby_id}:player:*")
-    count = 0
-    for key in player_keys:
-        player = await redis.hgetall(key)
-        if player.get("ready") == "true" and player.get("active") == "true":
-            count += 1
-    return count
+    player_keys = await _get_player_keys(lobby_id)
+    players = await _get_players(player_keys)
+    return sum(1 for p in players if p.get("ready") == "1" and p.get("active") == "1")
 
 
 # --- Timers & State Transitions ---
@@ -197,38 +266,138 @@ def _generate_random_grid() -> List[List[int]]:
     return [nums[0:3], nums[3:6], nums[6:9]]
 
 
-async def forming_timer(lobby_id: str):
-    """2-minute countdown. When it expires, auto-submit random grids for unready players and start."""
-    await asyncio.sleep(FORMING_TIMEOUT)
+async def forming_timeout(lobby_id: str):
+    """Forming deadline passed: auto-submit random grids for unready players and start."""
+    lock_acquired = await redis.set(f"lobby:{lobby_id}:timeout_lock", "1", nx=True, ex=30)
+    if not lock_acquired:
+        return
 
     lobby = await redis.hgetall(f"lobby:{lobby_id}")
     if not lobby or lobby["status"] != "forming":
+        await redis.zrem(FORMING_DEADLINES_KEY, lobby_id)
         return
 
-    # Auto-submit random grids for unready players
-    player_keys = await redis.keys(f"lobby:{lobby_id}:player:*")
-    for key in player_keys:
-        player = await redis.hgetall(key)
-        if player.get("active") == "true" and player.get("ready") != "true":
-            grid = _generate_random_grid()
-            flat = [n for row in grid for n in row]
-            await redis.hset(key, mapping={
-                "numbers": json.dumps(flat),
-                "grid": json.dumps(grid),
-                "ready": "true",
-            })
+    player_keys = await _get_player_keys(lobby_id)
+    players = await _get_players(player_keys)
+    active_keys = [key for key, player in zip(player_keys, players) if player.get("active") == "1"]
+
+    # Auto-submit random grids for unready players in one round-trip
+    async with redis.pipeline(transaction=False) as pipe:
+        for key, player in zip(player_keys, players):
+            if player.get("active") == "1" and player.get("ready") != "1":
+                grid = _generate_random_grid()
+                pipe.hset(key, mapping={
+                    **_grid_fields(grid),
+                    "ready": "1",
+                })
+        pipe.hincrby(f"lobby:{lobby_id}", "version", 1)
+        await pipe.execute()
 
     # All players now have grids — start if enough players
-    active_keys = []
-    for key in player_keys:
-        player = await redis.hgetall(key)
-        if player.get("active") == "true":
-            active_keys.append(key)
-
     if len(active_keys) >= MIN_PLAYERS:
         await start_game(lobby_id)
     else:
         await finish_game(lobby_id, winner=None)
+    await redis.zrem(FORMING_DEADLINES_KEY, lobby_id)
+
+
+# Forming deadlines are Redis keys with a TTL rather than in-process sleeps, so
+# the timeout fires even if the worker that created the lobby is gone. Every
+# worker listens for expirations; the timeout lock makes sure only one acts.
+# Expiry events are at-most-once (missed while no listener is subscribed), so
+# a periodic sweep over the deadline index catches any that were dropped.
+FORMING_EXPIRES_PREFIX = "lobby:"
+FORMING_EXPIRES_SUFFIX = ":forming_expires"
+_forming_tasks: List[asyncio.Task] = []
+_timeout_tasks: set = set()  # strong refs so in-flight forming_timeout tasks aren't GC'd
+
+
+async def _enable_expiry_notifications():
+    """Turn on keyevent expiry notifications ("E" plus "x" in notify-keyspace-events).
+    Best effort: warns instead of raising, since the sweep still covers timeouts."""
+    def enabled(flags: str) -> bool:
+        return "E" in flags and ("x" in flags or "A" in flags)
+
+    try:
+        current = (await redis.config_get("notify-keyspace-events")).get("notify-keyspace-events", "")
+        if enabled(current):
+            return
+        try:
+            await redis.config_set("notify-keyspace-events", current + "Ex")
+        except ResponseError:
+            pass
+        current = (await redis.config_get("notify-keyspace-events")).get("notify-keyspace-events", "")
+    except ResponseError:
+        # CONFIG disabled (common on managed Redis) — can't verify
+        logger.warning("Cannot read notify-keyspace-events; forming timeouts rely on the sweep")
+        return
+
+    if not enabled(current):
+        logger.warning(
+            "Redis notify-keyspace-events is %r and lacks 'Ex'; forming timeouts rely on the sweep",
+            current,
+        )
+
+
+def _forming_timeout_done(task: asyncio.Task):
+    _timeout_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Forming timeout failed", exc_info=task.exception())
+
+
+async def _listen_for_forming_timeouts():
+    """React to expired forming deadline keys, reconnecting if Redis drops."""
+    while True:
+        try:
+            # Checked on every (re)connect: a restarted Redis loses CONFIG SET
+            await _enable_expiry_notifications()
+            pubsub = pubsub_redis.pubsub()
+            await pubsub.psubscribe("__keyevent@*__:expired")
+            try:
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    key = message["data"]
+                    if key.startswith(FORMING_EXPIRES_PREFIX) and key.endswith(FORMING_EXPIRES_SUFFIX):
+                        lobby_id = key[len(FORMING_EXPIRES_PREFIX):-len(FORMING_EXPIRES_SUFFIX)]
+                        task = asyncio.create_task(forming_timeout(lobby_id))
+                        _timeout_tasks.add(task)
+                        task.add_done_callback(_forming_timeout_done)
+            finally:
+                await pubsub.aclose()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Forming timeout listener failed; reconnecting")
+            await asyncio.sleep(1)
+
+
+async def _sweep_forming_timeouts():
+    """Run forming_timeout for any lobby whose deadline has passed (missed events)."""
+    while True:
+        try:
+            overdue = await redis.zrangebyscore(FORMING_DEADLINES_KEY, "-inf", int(time.time()))
+            for lobby_id in overdue:
+                await forming_timeout(lobby_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Forming timeout sweep failed")
+        await asyncio.sleep(FORMING_SWEEP_INTERVAL)
+
+
+async def start_forming_listener():
+    """Start this worker's forming-deadline listener and reconciliation sweep.
+    Never fails startup: both tasks retry on their own if Redis is unreachable."""
+    _forming_tasks.append(asyncio.create_task(_listen_for_forming_timeouts()))
+    _forming_tasks.append(asyncio.create_task(_sweep_forming_timeouts()))
+
+
+async def stop_forming_listener():
+    """Stop this worker's forming-deadline listener and sweep."""
+    for task in _forming_tasks:
+        task.cancel()
+    _forming_tasks.clear()
 
 
 async def start_game(lobby_id: str):
@@ -243,92 +412,213 @@ async def start_game(lobby_id: str):
 
     await redis.hset(f"lobby:{lobby_id}", mapping={
         "status": "active",
-        "started_at": datetime.utcnow().isoformat(),
+        "started_at": _now(),
     })
 
     await redis.expire(f"lobby:{lobby_id}", LOBBY_TTL)
+    # Shuffled call order, consumed one LPOP per tick by call_numbers_task
+    pool = _system_random.sample(range(1, MAX_NUMBER + 1), MAX_NUMBER)
+    pool_key = f"lobby:{lobby_id}:pool"
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.delete(pool_key)
+        pipe.rpush(pool_key, *pool)
+        pipe.expire(pool_key, LOBBY_TTL)
+        await pipe.execute()
+    await publish_event(lobby_id, "started")
 
     asyncio.create_task(call_numbers_task(lobby_id))
 
 
 # --- Number Calling ---
 
-async def call_numbers_task(lobby_id: str):
-    """Background task that calls numbers every 3 seconds."""
-    numbers_pool = list(range(1, MAX_NUMBER + 1))
-    random.shuffle(numbers_pool)
+# One tick of number calling in a single atomic call: only pops and records a
+# number while the lobby is still active, so a claim that finishes the game
+# can never be followed by another number.
+# KEYS: lobby, pool, numbers_called, numbers_called_set
+# ARGV: ttl, events channel (a channel is not a key, so it goes in ARGV)
+# Returns the called number, 'inactive' if the game is over, or nil when the pool is empty
+CALL_NEXT_NUMBER_LUA = """
+local lobby_key, pool_key, called_key, called_set_key = KEYS[1], KEYS[2], KEYS[3], KEYS[4]
+local events_channel = ARGV[2]
 
-    for number in numbers_pool:
-        lobby = await redis.hgetall(f"lobby:{lobby_id}")
-        if not lobby or lobby["status"] != "active":
-            return
+if redis.call('HGET', lobby_key, 'status') ~= 'active' then return 'inactive' end
 
-        current_latest = lobby.get("latest_number", "")
+local number = redis.call('LPOP', pool_key)
+if not number then return false end
 
-        await redis.rpush(f"lobby:{lobby_id}:numbers_called", str(number))
+redis.call('RPUSH', called_key, number)
+redis.call('SADD', called_set_key, number)
+redis.call('EXPIRE', called_set_key, tonumber(ARGV[1]))
 
-        update = {"latest_number": str(number)}
-        if current_latest:
-            update["previous_number"] = current_latest
-        await redis.hset(f"lobby:{lobby_id}", mapping=update)
+local latest = redis.call('HGET', lobby_key, 'latest_number')
+if latest and latest ~= '' then
+    redis.call('HSET', lobby_key, 'previous_number', latest)
+end
+redis.call('HSET', lobby_key, 'latest_number', number)
+redis.call('HINCRBY', lobby_key, 'version', 1)
+redis.call('PUBLISH', events_channel, cjson.encode({type = 'number', value = tonumber(number)}))
+return number
+"""
 
-        await asyncio.sleep(NUMBER_CALL_INTERVAL)
+_call_next_number_script = redis.register_script(CALL_NEXT_NUMBER_LUA)
 
-    await finish_game(lobby_id, winner=None)
 
+async def call_numbers_task(lobby_id: str):
+    """Background task that calls the next number from the lobby's pool every 3 seconds."""
+    while True:
+        number = await _call_next_number_script(
+            keys=[
+                f"lobby:{lobby_id}",
+                f"lobby:{lobby_id}:pool",
+                f"lobby:{lobby_id}:numbers_called",
+                f"lobby:{lobby_id}:numbers_called_set",
+            ],
+            args=[LOBBY_TTL, events_channel(lobby_id)],
+        )
+        if number == "inactive":
+            return
+        if number is None:
+            break
 
-# --- Win Verification ---
+        await asyncio.sleep(NUMBER_CALL_INTERVAL)
 
-def check_win_patterns(grid: List[List[int]], numbers_called: set) -> Optional[str]:
-    """Check all 8 possible winning patterns."""
-    for i in range(3):
-        if all(grid[i][j] in numbers_called for j in range(3)):
-            return f"row_{i}"
+    await finish_game(lobby_id, winner=None)
 
-    for j in range(3):
-        if all(grid[i][j] in numbers_called for i in range(3)):
-            return f"col_{j}"
 
-    if all(grid[i][i] in numbers_called for i in range(3)):
-        return "diagonal_main"
+# --- Win Verification ---
 
-    if all(grid[i][2 - i] in numbers_called for i in range(3)):
-        return "diagonal_anti"
+# All 8 winning patterns as grid cells, in the order they are checked
+WIN_PATTERNS = [
+    ("row_0", [(0, 0), (0, 1), (0, 2)]),
+    ("row_1", [(1, 0), (1, 1), (1, 2)]),
+    ("row_2", [(2, 0), (2, 1), (2, 2)]),
+    ("col_0", [(0, 0), (1, 0), (2, 0)]),
+    ("col_1", [(0, 1), (1, 1), (2, 1)]),
+    ("col_2", [(0, 2), (1, 2), (2, 2)]),
+    ("diagonal_main", [(0, 0), (1, 1), (2, 2)]),
+    ("diagonal_anti", [(0, 2), (1, 1), (2, 0)]),
+]
 
-    return None
 
+def _pattern_masks(grid: List[List[int]]) -> List[int]:
+    """Encode each winning pattern as a bitmask with bit n-1 set for each number n.
+    A pattern is complete when (mask & highlighted_mask) == mask."""
+    return [sum(1 << (grid[i][j] - 1) for i, j in cells) for _, cells in WIN_PATTERNS]
 
-async def verify_claim(lobby_id: str, alien_id: str, highlighted_numbers: List[int]) -> dict:
-    """Verify a bingo claim using the player's highlighted numbers."""
-    lobby = await redis.hgetall(f"lobby:{lobby_id}")
-    if not lobby:
-        raise ValueError("Lobby not found")
-
-    if lobby["status"] != "active":
-        raise ValueError("Game is not active")
-
-    player = await redis.hgetall(f"lobby:{lobby_id}:player:{alien_id}")
-    if not player:
-        raise ValueError("Player not in this lobby")
-
-    if player.get("active") != "true":
-        raise ValueError("Player is no longer active in this game")
 
-    grid = json.loads(player["grid"])
-    called_raw = await redis.lrange(f"lobby:{lobby_id}:numbers_called", 0, -1)
-    numbers_called = set(int(n) for n in called_raw)
+def _grid_fields(grid: List[List[int]]) -> dict:
+    """Player hash fields for a validated grid. Pattern masks are stored as
+    integer strings so the claim script never has to decode the grid JSON."""
+    flat = [n for row in grid for n in row]
+    return {
+        "numbers": orjson.dumps(flat),
+        "grid": orjson.dumps(grid),
+        "pattern_masks": ",".join(str(m) for m in _pattern_masks(grid)),
+    }
 
-    highlighted_set = set(highlighted_numbers)
 
-    # Check 1: Do highlighted numbers form a winning pattern on the grid?
-    pattern = check_win_patterns(grid, highlighted_set)
+# Atomically verifies a claim and applies the outcome in a single round-trip.
+# Every key it touches is declared in KEYS; the active-players set stands in
+# for reading other players' hashes, so the script stays cluster-safe.
+# KEYS: lobby, player, numbers_called_set, players set, active players set, global lobby pointer
+# ARGV: alien_id, finished_at, events channel, highlighted numbers...
+# Returns {"error", message} | {"won", pattern, pot} | {"kicked"}
+VERIFY_CLAIM_LUA = """
+local lobby_key, player_key, called_key, players_key, active_players_key, global_key =
+    KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5], KEYS[6]
+local events_channel = ARGV[3]
+
+local status = redis.call('HGET', lobby_key, 'status')
+if not status then return {'error', 'Lobby not found'} end
+if status ~= 'active' then return {'error', 'Game is not active'} end
+
+if redis.call('EXISTS', player_key) == 0 then
+    return {'error', 'Player not in this lobby'}
+end
+if redis.call('HGET', player_key, 'active') ~= '1' then
+    return {'error', 'Player is no longer active in this game'}
+end
+
+local function finish(winner)
+    redis.call('HSET', lobby_key, 'status', 'finished', 'winner', winner, 'finished_at', ARGV[2])
+    redis.call('HINCRBY', lobby_key, 'version', 1)
+    redis.call('DEL', players_key, active_players_key)
+    -- Clear global lobby pointer so next join creates a fresh lobby
+    redis.call('DEL', global_key)
+    redis.call('PUBLISH', events_channel, cjson.encode({type = 'finished', winner = (winner ~= '' and winner) or cjson.null}))
+end
+
+local highlighted = {}
+for i = 4, #ARGV do highlighted[tonumber(ARGV[i])] = true end
+
+-- Check 1: Do highlighted numbers form a winning pattern on the grid?
+-- Pattern masks are precomputed at submit time (see _pattern_masks)
+local highlighted_mask = 0
+for n in pairs(highlighted) do
+    if n >= 1 and n <= 32 then highlighted_mask = bit.bor(highlighted_mask, bit.lshift(1, n - 1)) end
+end
+local pattern_names = {'row_0', 'row_1', 'row_2', 'col_0', 'col_1', 'col_2', 'diagonal_main', 'diagonal_anti'}
+local pattern = nil
+local i = 0
+for mask in string.gmatch(redis.call('HGET', player_key, 'pattern_masks') or '', '%d+') do
+    i = i + 1
+    mask = tonumber(mask)
+    if bit.band(mask, highlighted_mask) == mask then
+        pattern = pattern_names[i]
+        break
+    end
+end
+
+-- Check 2: Are ALL highlighted numbers actually called?
+local numbers = {}
+for n in pairs(highlighted) do table.insert(numbers, n) end
+local all_called = true
+if #numbers > 0 then
+    for _, hit in ipairs(redis.call('SMISMEMBER', called_key, unpack(numbers))) do
+        if hit == 0 then all_called = false end
+    end
+end
+
+if pattern and all_called then
+    local pot = redis.call('HGET', lobby_key, 'pot')
+    finish(ARGV[1])
+    return {'won', pattern, pot}
+end
+
+redis.call('HSET', player_key, 'active', '0')
+redis.call('SREM', active_players_key, ARGV[1])
+redis.call('HINCRBY', lobby_key, 'version', 1)
+redis.call('PUBLISH', events_channel, cjson.encode({type = 'kicked', alien_id = ARGV[1]}))
+if redis.call('SCARD', active_players_key) == 0 then
+    finish('')
+end
+return {'kicked'}
+"""
+
+# Loaded once and invoked via EVALSHA (reloaded automatically on NOSCRIPT)
+_verify_claim_script = redis.register_script(VERIFY_CLAIM_LUA)
 
-    # Check 2: Are ALL highlighted numbers actually called?
-    all_called = highlighted_set.issubset(numbers_called)
 
-    if pattern and all_called:
-        pot = int(lobby["pot"])
-        await finish_game(lobby_id, winner=alien_id)
+async def verify_claim(lobby_id: str, alien_id: str, highlighted_numbers: List[int]) -> dict:
+    """Verify a bingo claim using the player's highlighted numbers."""
+    result = await _verify_claim_script(
+        keys=[
+            f"lobby:{lobby_id}",
+            f"lobby:{lobby_id}:player:{alien_id}",
+            f"lobby:{lobby_id}:numbers_called_set",
+            f"lobby:{lobby_id}:players",
+            f"lobby:{lobby_id}:active_players",
+            GLOBAL_LOBBY_KEY,
+        ],
+        args=[alien_id, _now(), events_channel(lobby_id), *highlighted_numbers],
+    )
+
+    outcome = result[0]
+    if outcome == "error":
+        raise ValueError(result[1])
+
+    if outcome == "won":
+        pattern, pot = result[1], int(result[2])
         return {
             "valid": True,
             "winner": True,
@@ -336,28 +626,12 @@ async def verify_claim(lobby_id: str, alien_id: str, highlighted_numbers: List[i
             "message": f"YOU WON! +{pot:,} Alien coins",
             "pattern": pattern,
         }
-    else:
-        await redis.hset(f"lobby:{lobby_id}:player:{alien_id}", "active", "false")
-
-        all_kicked = await check_all_players_kicked(lobby_id)
-        if all_kicked:
-            await finish_game(lobby_id, winner=None)
-
-        return {
-            "valid": False,
-            "kicked": True,
-            "message": "Invalid claim. You've been removed from the game.",
-        }
-
 
-async def check_all_players_kicked(lobby_id: str) -> bool:
-    """Check if all players have been kicked."""
-    player_keys = await redis.keys(f"lobby:{lobby_id}:player:*")
-    for key in player_keys:
-        player = await redis.hgetall(key)
-        if player.get("active") == "true":
-            return False
-    return True
+    return {
+        "valid": False,
+        "kicked": True,
+        "message": "Invalid claim. You've been removed from the game.",
+    }
 
 
 async def finish_game(lobby_id: str, winner: Optional[str]):
@@ -365,58 +639,93 @@ async def finish_game(lobby_id: str, winner: Optional[str]):
     await redis.hset(f"lobby:{lobby_id}", mapping={
         "status": "finished",
         "winner": winner or "",
-        "finished_at": datetime.utcnow().isoformat(),
+        "finished_at": _now(),
     })
+    await redis.delete(f"lobby:{lobby_id}:players", f"lobby:{lobby_id}:active_players")
     # Clear global lobby pointer so next join creates a fresh lobby
     await redis.delete(GLOBAL_LOBBY_KEY)
+    await publish_event(lobby_id, "finished", winner=winner)
 
 
 # --- Game Status ---
 
+# lobby_id -> (version, status snapshot). Writers bump the lobby's version
+# field, so a snapshot stays valid until its version changes. The version
+# lives in Redis, so this is safe with several workers.
+_status_cache: dict = {}
+STATUS_CACHE_SIZE = 64
+
+
 async def get_game_status(lobby_id: str) -> dict:
-    """Get full game status for polling."""
-    lobby = await redis.hgetall(f"lobby:{lobby_id}")
+    """Get full game status for polling. Served from the in-process snapshot
+    when the lobby's version is unchanged (a single HGET)."""
+    version = await redis.hget(f"lobby:{lobby_id}", "version")
+    cached = _status_cache.get(lobby_id)
+    if cached and version is not None and cached[0] == version:
+        snapshot = cached[1]
+    else:
+        snapshot = await _load_game_status(lobby_id)
+        _status_cache.pop(lobby_id, None)
+        if len(_status_cache) >= STATUS_CACHE_SIZE:
+            _status_cache.pop(next(iter(_status_cache)))
+        _status_cache[lobby_id] = (snapshot["version"], snapshot)
+
+    # Elapsed time moves without state changes, so it's never cached
+    time_elapsed = 0
+    if snapshot["started_at"]:
+        time_elapsed = int(time.time()) - snapshot["started_at"]
+
+    status = {k: v for k, v in snapshot.items() if k != "started_at"}
+    status["time_elapsed"] = time_elapsed
+    return status
+
+
+async def _load_game_status(lobby_id: str) -> dict:
+    """Read the full game status snapshot from Redis."""
+    # Round-trip 1: lobby hash, player ids and called numbers in one MULTI/EXEC
+    async with redis.pipeline() as pipe:
+        pipe.hgetall(f"lobby:{lobby_id}")
+        pipe.smembers(f"lobby:{lobby_id}:players")
+        pipe.lrange(f"lobby:{lobby_id}:numbers_called", 0, -1)
+        lobby, alien_ids, called_raw = await pipe.execute()
     if not lobby:
         raise ValueError("Lobby not found")
 
-    player_keys = await redis.keys(f"lobby:{lobby_id}:player:*")
+    # Round-trip 2: every player hash
+    player_keys = [f"lobby:{lobby_id}:player:{aid}" for aid in alien_ids]
     players = {}
     ready_count = 0
-    for key in player_keys:
-        player_data = await redis.hgetall(key)
+    for player_data in await _get_players(player_keys):
+        if not player_data:
+            continue
         aid = player_data["alien_id"]
-        is_ready = player_data.get("ready") == "true"
-        if is_ready and player_data.get("active") == "true":
+        is_ready = player_data.get("ready") == "1"
+        if is_ready and player_data.get("active") == "1":
             ready_count += 1
         players[aid] = {
             "alien_id": aid,
-            "numbers": json.loads(player_data.get("numbers", "[]")),
-            "grid": json.loads(player_data.get("grid", "[]")),
+            "numbers": orjson.loads(player_data.get("numbers", "[]")),
+            "grid": orjson.loads(player_data.get("grid", "[]")),
             "ready": is_ready,
-            "active": player_data.get("active") == "true",
-            "joined_at": player_data.get("joined_at", ""),
+            "active": player_data.get("active") == "1",
+            "joined_at": _to_iso(player_data.get("joined_at", "")),
         }
 
-    called_raw = await redis.lrange(f"lobby:{lobby_id}:numbers_called", 0, -1)
     called_numbers = [int(n) for n in called_raw]
 
-    time_elapsed = 0
-    if lobby.get("started_at"):
-        started = datetime.fromisoformat(lobby["started_at"])
-        time_elapsed = int((datetime.utcnow() - started).total_seconds())
-
     return {
         "lobby_id": lobby["lobby_id"],
+        "version": lobby.get("version", ""),
         "status": lobby["status"],
         "buy_in_amount": int(lobby["buy_in_amount"]),
         "pot": int(lobby["pot"]),
         "player_count": len(player_keys),
         "ready_count": ready_count,
         "players": players,
-        "forming_deadline": lobby.get("forming_deadline") or None,
+        "forming_deadline": _to_iso(lobby.get("forming_deadline")) or None,
         "latest_number": int(lobby["latest_number"]) if lobby.get("latest_number") else None,
         "previous_number": int(lobby["previous_number"]) if lobby.get("previous_number") else None,
         "called_numbers": called_numbers,
         "winner": lobby.get("winner") or None,
-        "time_elapsed": time_elapsed,
+        "started_at": int(lobby["started_at"]) if lobby.get("started_at") else None,
     }
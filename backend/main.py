@@ -1,29 +1,37 @@
-from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi import FastAPI, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
-from typing import List
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel, Field
+from typing import Annotated, List
 from pathlib import Path
 import os
-import json
+import orjson
+import asyncio
 from dotenv import load_dotenv
 from datetime import datetime
 
-from redis_client import redis, check_redis_connection
-from auth import verify_alien_token
+from redis_client import redis, pubsub_redis, check_redis_connection
+from auth import verify_alien_token, start_auth, stop_auth
 from lobby import (
     get_or_create_global_lobby,
     add_player_to_lobby,
     submit_grid as lobby_submit_grid,
     get_game_status as lobby_get_game_status,
     verify_claim,
+    events_channel,
+    publish_event,
+    start_forming_listener,
+    stop_forming_listener,
 )
 
 load_dotenv()
 
 app = FastAPI()
 
+# Seconds a WebSocket client has to send its token after connecting
+WS_AUTH_TIMEOUT = 5
+
 # Serve frontend static files in production
 STATIC_DIR = Path(__file__).parent.parent / "frontend" / "dist"
 
@@ -39,17 +47,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def startup():
+    await start_auth()
+    await start_forming_listener()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await stop_forming_listener()
+    await stop_auth()
+
+
 # --- Pydantic Models ---
+# Shapes are constrained here so pydantic-core rejects malformed bodies
+# during parsing, before any Python-level validation runs.
+GridRow = Annotated[List[int], Field(min_length=3, max_length=3)]
+
 class JoinLobbyRequest(BaseModel):
     alien_id: str
 
 class SubmitGridRequest(BaseModel):
     alien_id: str
-    grid: List[List[int]]
+    grid: Annotated[List[GridRow], Field(min_length=3, max_length=3)]
 
 class ClaimRequest(BaseModel):
     alien_id: str
-    highlighted_numbers: List[int]
+    highlighted_numbers: Annotated[List[int], Field(max_length=9)]
 
 # --- API Endpoints ---
 
@@ -92,12 +116,19 @@ async def submit_grid(lobby_id: str, request: SubmitGridRequest, alien_id: str =
 
 
 @app.get("/api/game/{lobby_id}/status")
-async def get_game_status(lobby_id: str, alien_id: str = Depends(verify_alien_token)):
+async def get_game_status(lobby_id: str, request: Request, response: Response, alien_id: str = Depends(verify_alien_token)):
     try:
-        return await lobby_get_game_status(lobby_id)
+        status = await lobby_get_game_status(lobby_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    # Unchanged lobby state (and elapsed second) → 304, no body
+    etag = f'W/"{status["version"]}-{status["time_elapsed"]}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return status
+
 
 @app.post("/api/game/{lobby_id}/claim")
 async def claim_bingo(lobby_id: str, request: ClaimRequest, alien_id: str = Depends(verify_alien_token)):
@@ -110,10 +141,61 @@ async def claim_bingo(lobby_id: str, request: ClaimRequest, alien_id: str = Depe
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.websocket("/api/game/{lobby_id}/ws")
+async def game_events(websocket: WebSocket, lobby_id: str):
+    """Push lobby events (called numbers, joins, grids, claims) to the client.
+    Browsers can't set headers on WebSockets, and a query param would end up in
+    access logs, so the token is the first frame the client sends.
+    Clients fetch /status once on connect for the snapshot."""
+    await websocket.accept()
+    try:
+        token = await asyncio.wait_for(websocket.receive_text(), timeout=WS_AUTH_TIMEOUT)
+        await verify_alien_token(f"Bearer {token}")
+    except WebSocketDisconnect:
+        return
+    except (asyncio.TimeoutError, HTTPException):
+        await websocket.close(code=1008)
+        return
+
+    pubsub = pubsub_redis.pubsub()
+    await pubsub.subscribe(events_channel(lobby_id))
+
+    async def forward():
+        async for message in pubsub.listen():
+            if message["type"] == "message":
+                await websocket.send_text(message["data"])
+
+    async def receive():
+        # Nothing more is expected from the client; this just waits for disconnect
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    forward_task = asyncio.create_task(forward())
+    receive_task = asyncio.create_task(receive())
+    try:
+        done, _ = await asyncio.wait({forward_task, receive_task}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        forward_task.cancel()
+        receive_task.cancel()
+        await pubsub.aclose()
+
+    # Forwarding stopped (e.g. Redis dropped) while the client is still
+    # connected — close so the client falls back to polling
+    if receive_task not in done:
+        forward_task.exception()  # retrieve it so asyncio doesn't log it as unhandled
+        try:
+            await websocket.close(code=1011)
+        except RuntimeError:
+            pass
+
+
 @app.post("/api/webhooks/payment")
 async def payment_webhook(request: Request):
     body = await request.body()
-    payload = json.loads(body)
+    payload = orjson.loads(body)
 
     invoice_id = payload.get("invoice")
     if not invoice_id:
@@ -128,6 +210,7 @@ async def payment_webhook(request: Request):
         amount = int(invoice_data["amount"])
         await redis.hset(f"invoice:{invoice_id}", "status", "finalized")
         await redis.hincrby(f"lobby:{lobby_id}", "pot", amount)
+        await publish_event(lobby_id, "pot_updated")
 
     return {"success": True}
 
@@ -5,7 +5,32 @@ from dotenv import load_dotenv
 load_dotenv()
 
 redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
-redis = aioredis.from_url(redis_url, decode_responses=True)
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "64"))
+REDIS_POOL_TIMEOUT = 5  # seconds to wait for a free connection before erroring
+
+# Command pool: when all connections are busy, callers wait (up to
+# REDIS_POOL_TIMEOUT) for one to free up instead of failing outright.
+# Hot paths batch commands with pipeline(transaction=False); MULTI/EXEC is
+# only used where a consistent snapshot or all-or-nothing write matters.
+pool = aioredis.BlockingConnectionPool.from_url(
+    redis_url,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    timeout=REDIS_POOL_TIMEOUT,
+    health_check_interval=30,
+    socket_keepalive=True,
+    decode_responses=True,
+)
+redis = aioredis.Redis(connection_pool=pool)
+
+# Pub/Sub subscribers (WebSockets, forming listener) each hold a connection for
+# their whole lifetime, so they get their own pool and can never starve the
+# command pool above.
+pubsub_redis = aioredis.from_url(
+    redis_url,
+    health_check_interval=30,
+    socket_keepalive=True,
+    decode_responses=True,
+)
 
 async def check_redis_connection():
     try:
@@ -1,7 +1,7 @@
 import { useState, useEffect, useCallback } from 'react';
-import { getGameStatus } from '../services/api';
+import { getGameStatus, gameEventsUrl } from '../services/api';
 import { POLL_INTERVAL } from '../config';
-import type { GameStatus } from '../types';
+import type { GameStatus, GameEvent } from '../types';
 
 export function useGameState(lobbyId: string | null, authToken: string | null) {
   const [gameState, setGameState] = useState<GameStatus | null>(null);
@@ -24,8 +24,46 @@ export function useGameState(lobbyId: string | null, authToken: string | null) {
     // Fetch immediately
     fetchStatus();
 
-    const interval = setInterval(fetchStatus, POLL_INTERVAL);
-    return () => clearInterval(interval);
+    // Server pushes events over a WebSocket; fall back to polling while it's down
+    let interval: ReturnType<typeof setInterval> | null = setInterval(fetchStatus, POLL_INTERVAL);
+    const stopPolling = () => {
+      if (interval) clearInterval(interval);
+      interval = null;
+    };
+    const startPolling = () => {
+      if (!interval) interval = setInterval(fetchStatus, POLL_INTERVAL);
+    };
+
+    const ws = new WebSocket(gameEventsUrl(lobbyId));
+    ws.onopen = () => {
+      ws.send(authToken); // server authenticates the first frame
+      stopPolling();
+      fetchStatus(); // snapshot of anything missed before subscribing
+    };
+    ws.onmessage = (msg) => {
+      const event: GameEvent = JSON.parse(msg.data);
+      if (event.type === 'number') {
+        setGameState((prev) => {
+          // Already in the snapshot fetched on connect
+          if (!prev || prev.called_numbers.includes(event.value)) return prev;
+          return {
+            ...prev,
+            previous_number: prev.latest_number,
+            latest_number: event.value,
+            called_numbers: [...prev.called_numbers, event.value],
+          };
+        });
+      } else {
+        fetchStatus();
+      }
+    };
+    ws.onclose = startPolling;
+
+    return () => {
+      ws.onclose = null;
+      ws.close();
+      stopPolling();
+    };
   }, [lobbyId, authToken, fetchStatus]);
 
   return { gameState, error, refetch: fetchStatus };
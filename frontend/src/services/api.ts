@@ -55,6 +55,12 @@ export async function getGameStatus(
   });
 }
 
+// The auth token is sent as the first frame once the socket opens, not in the URL
+export function gameEventsUrl(lobbyId: string): string {
+  const base = (API_URL || window.location.origin).replace(/^http/, 'ws');
+  return `${base}/api/game/${lobbyId}/ws`;
+}
+
 export async function claimBingo(
   token: string,
   lobbyId: string,
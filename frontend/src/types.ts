@@ -9,6 +9,7 @@ export interface Player {
 
 export interface GameStatus {
   lobby_id: string;
+  version: string;
   status: 'forming' | 'active' | 'finished' | 'in_progress';
   buy_in_amount: number;
   pot: number;
@@ -23,6 +24,12 @@ export interface GameStatus {
   time_elapsed: number;
 }
 
+export type GameEvent =
+  | { type: 'number'; value: number }
+  | { type: 'player_joined' | 'grid_ready' | 'kicked'; alien_id: string }
+  | { type: 'started' | 'pot_updated' }
+  | { type: 'finished'; winner: string | null };
+
 export interface ClaimResult {
   valid: boolean;
   winner: boolean;